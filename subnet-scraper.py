@@ -2,21 +2,69 @@
 """
 A script to scan IP subnets by pinging all hosts within specified network ranges.
 
-Automatically detects the host system's OS and uses the appropriate ping command.
+Sweeps directly attached subnets with ARP when run as root on Linux. Sends
+ICMP echo requests for other subnets from a single socket and collects the
+replies in one receive loop. When an ICMP socket can't be opened (missing
+privileges), uses a single fping or nmap process per subnet if either is
+installed, and otherwise falls back to running the OS ping command
+concurrently under asyncio.
 Supports both direct subnet specification and reading from CSV files.
-Uses thread pooling for efficient scanning of large subnets.
 """
 # Standard library imports
 import argparse
+import asyncio
 import csv
 import ipaddress
 import os
 import platform
+import select
+import shutil
+import socket
+import struct
 import subprocess
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+
+# ICMP message types used by the socket-based scanner
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+ICMP_PAYLOAD = b"subnet-scraper"
+
+# ICMP header: type, code, checksum, identifier, sequence number
+ICMP_HEADER = struct.Struct("!BBHHH")
+
+# An IPv4 address as a 32-bit integer in network byte order
+IPV4_STRUCT = struct.Struct("!I")
+
+# Receive buffer requested for the ICMP socket so a burst of replies isn't
+# dropped while we're still sending (the kernel may cap it lower)
+ICMP_RECV_BUFFER = 4 * 1024 * 1024
+
+# Lets the receiver drain every queued reply after one select() call;
+# platforms without it (Windows) read one reply per select()
+RECV_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0)
+
+# Hosts per datagram ICMP socket before a sweep is spread over more sockets
+ICMP_HOSTS_PER_SOCKET = 4096
+
+# ARP constants used by the LAN sweep (Linux only)
+ETH_P_ARP = 0x0806
+ETH_P_IP = 0x0800
+ARPHRD_ETHER = 1
+ARP_REQUEST = 1
+ARP_REPLY = 2
+SIOCGIFFLAGS = 0x8913
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891B
+SIOCGIFHWADDR = 0x8927
+IFF_UP = 0x1
+
+# Scanning backends. 'auto' sweeps directly attached subnets with ARP when
+# it can and tries the others, in this order, for everything else
+BACKENDS = ["auto", "arp", "icmp", "fping", "nmap", "ping"]
 
 def check_os():
     """
@@ -34,101 +82,303 @@ def check_os():
     else:
         return 'other'
 
-def ping_ip_windows(ip, timeout=100, count=1):
+def make_pinger(os_type, timeout=0.1, count=1):
     """
-    Ping a single IP address from a Windows device.
+    Create the coroutine that pings a single IP address with the OS ping command.
+    
+    Only the target IP changes between hosts, so the rest of the command line
+    and the subprocess options are bound once here instead of on every ping.
     
     Args:
-        ip (str): IP address to ping
-        timeout (int): Timeout in milliseconds (default: 100)
+        os_type (str): 'windows' or 'linux', as returned by check_os()
+        timeout (float): Timeout in seconds (default: 0.1)
         count (int): Number of ping attempts (default: 1)
         
     Returns:
-        bool: True if the IP responded, False otherwise
+        function: Coroutine taking an IP address string and returning True if
+                  the IP responded, False otherwise
     """
-    ip_str = str(ip)
-    try:
+    if os_type == 'windows':
         # Windows ping command with timeout in milliseconds
-        cmd = ["ping", "-n", str(count), "-w", str(timeout), ip_str]
-        
-        # Run the ping command and capture output
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False  # Avoid raising exception on non-zero exit code
-        )
-        
-        # Check if ping was successful (return code 0)
-        if result.returncode == 0 and "Reply from" in result.stdout:
-            return True
-        else:
-            return False
+        prefix = ["ping", "-n", str(count), "-w", str(int(timeout * 1000))]
+    else:
+        prefix = ["ping", "-c", str(count), "-W", str(int(timeout * 1000))]
+    
+    # Only the return code is needed, so the output is discarded
+    spawn = partial(
+        asyncio.create_subprocess_exec,
+        *prefix,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    
+    async def ping_ip(ip):
+        try:
+            # Run the ping command against this IP
+            process = await spawn(ip)
             
-    except Exception as e:
-        return False
+            # Check if ping was successful (return code 0)
+            return await process.wait() == 0
+        except Exception as e:
+            return False
+    
+    return ping_ip
 
-def ping_ip_linux(ip, timeout=0.1, count=1):
+def icmp_checksum(data):
     """
-    Ping a single IP address from a Linux device.
+    Compute the Internet checksum (RFC 1071) of an ICMP message.
     
     Args:
-        ip (str): IP address to ping
-        timeout (float): Timeout in seconds (default: 0.1)
-        count (int): Number of ping attempts (default: 1)
-        
+        data (bytes): ICMP message with the checksum field set to zero
+    
     Returns:
-        bool: True if the IP responded, False otherwise
+        int: The 16-bit one's complement checksum
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    
+    # Sum all 16-bit words in one call, then fold the carries back in
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+def echo_request_builder(ident, payload=ICMP_PAYLOAD):
+    """
+    Create a function that builds ICMP echo requests for one sweep.
+    
+    All requests of a sweep share their type, identifier and payload and only
+    differ by sequence number, so the checksum of those fixed fields is
+    computed once. Each packet's checksum is then updated incrementally
+    (RFC 1624) with a single addition instead of summing the whole packet,
+    and only the header is rewritten in place in one reused buffer.
+    
+    Args:
+        ident (int): 16-bit identifier used to recognise our replies
+        payload (bytes): Data carried by the echo requests
+    
+    Returns:
+        function: Takes a 16-bit sequence number (index of the target IP) and
+                  returns the ICMP packet, checksum included. The packet is
+                  overwritten by the next call, so send it before then
+    """
+    # One's complement sum of every field except seq (seq = 0 adds nothing)
+    packet = bytearray(ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, ident, 0) + payload)
+    fixed_sum = ~icmp_checksum(bytes(packet)) & 0xFFFF
+    
+    def build(seq):
+        total = fixed_sum + seq
+        total = (total >> 16) + (total & 0xFFFF)
+        checksum = ~total & 0xFFFF
+        ICMP_HEADER.pack_into(packet, 0, ICMP_ECHO_REQUEST, 0, checksum, ident, seq)
+        return packet
+    
+    return build
+
+def open_icmp_socket():
+    """
+    Open a socket for sending ICMP echo requests.
+    
+    Tries an unprivileged datagram ICMP socket first (Linux, when the user's
+    group is within net.ipv4.ping_group_range), then falls back to a raw
+    ICMP socket, which requires root/administrator rights.
+    
+    Returns:
+        socket.socket: The opened ICMP socket
+    
+    Raises:
+        OSError: If neither socket type could be opened
     """
-    ip_str = str(ip)
     try:
-        # Linux ping command with timeout in seconds
-        cmd = ["ping", "-c", str(count), "-W", str(int(timeout * 1000)), ip_str]
-        
-        # Run the ping command and capture output
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False  # Avoid raising exception on non-zero exit code
-        )
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        pass
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+    # Windows refuses to receive on a raw socket that hasn't been bound
+    sock.bind(("0.0.0.0", 0))
+    return sock
+
+def open_arp_socket(interface=None):
+    """
+    Open a raw Ethernet socket for sending and receiving ARP.
+    
+    Args:
+        interface (str, optional): Name of the interface to bind to
         
-        # Check if ping was successful (return code 0)
-        if result.returncode == 0:
-            return True
-        else:
-            return False
+    Returns:
+        socket.socket: The opened AF_PACKET socket
+        
+    Raises:
+        OSError: If the socket could not be opened (not Linux, or not root)
+    """
+    if not hasattr(socket, "AF_PACKET"):
+        raise OSError("ARP sweeps need AF_PACKET sockets, which are Linux only")
+    
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP))
+    if interface:
+        sock.bind((interface, ETH_P_ARP))
+    return sock
+
+def find_arp_interface(subnet_ips):
+    """
+    Find the local Ethernet interface a subnet is directly attached to.
+    
+    Only hosts on a directly attached segment answer ARP, so this decides
+    whether a subnet can be swept with ARP at all.
+    
+    Args:
+        subnet_ips (range): IP addresses in the subnet, as integers
+        
+    Returns:
+        tuple: (interface name, interface IP as an integer, MAC address bytes),
+               or None if no interface that is up covers the whole subnet
+    """
+    if not hasattr(socket, "AF_PACKET"):
+        return None
+    
+    import fcntl  # POSIX only, so imported once we know we're on Linux
+    
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            # struct ifreq: 16-byte interface name followed by the result
+            request = struct.pack("256s", name.encode()[:15])
+            try:
+                flags = fcntl.ioctl(sock, SIOCGIFFLAGS, request)
+                hwaddr = fcntl.ioctl(sock, SIOCGIFHWADDR, request)
+                address = fcntl.ioctl(sock, SIOCGIFADDR, request)
+                netmask = fcntl.ioctl(sock, SIOCGIFNETMASK, request)
+            except OSError:
+                continue  # No IPv4 address on this interface
             
-    except Exception as e:
-        return False
+            if not struct.unpack("H", flags[16:18])[0] & IFF_UP:
+                continue
+            if struct.unpack("H", hwaddr[16:18])[0] != ARPHRD_ETHER:
+                continue
+            
+            ip = IPV4_STRUCT.unpack(address[20:24])[0]
+            mask = IPV4_STRUCT.unpack(netmask[20:24])[0]
+            if (subnet_ips[0] & mask) == (ip & mask) == (subnet_ips[-1] & mask):
+                return name, ip, hwaddr[18:24]
+    
+    return None
+
+def network_hosts(network):
+    """
+    Get the host addresses of a network as a lazy range of integers.
+    
+    Gives the same hosts as network.hosts() (network and broadcast addresses
+    excluded, except for /31 and /32), but nothing is allocated per host
+    until the scan iterates over it, however large the network is. The range
+    still supports len() and indexing by host offset.
+    
+    Args:
+        network (ipaddress.IPv4Network): The network to expand
+        
+    Returns:
+        range: Host addresses as unsigned 32-bit integers, in order
+    """
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if network.prefixlen < 31:
+        first += 1
+        last -= 1
+    return range(first, last + 1)
+
+def ip_to_str(ip):
+    """
+    Format an integer IP address in dotted-quad notation.
+    
+    Args:
+        ip (int): IP address as an unsigned 32-bit integer
+        
+    Returns:
+        str: The IP address, e.g. '192.168.1.5'
+    """
+    return socket.inet_ntoa(IPV4_STRUCT.pack(ip))
+
+def ips_to_str(ips):
+    """
+    Format a sequence of integer IP addresses in dotted-quad notation.
+    
+    Chains a precompiled struct and socket.inet_ntoa with map(), so the
+    loop over the addresses runs in C rather than calling ip_to_str() for
+    each one. The strings are produced lazily, so each address only exists
+    while it is being used, however large the subnet.
+    
+    Args:
+        ips (range): IP addresses as unsigned 32-bit integers
+        
+    Returns:
+        iterator: The IP addresses as strings, in the same order
+    """
+    return map(socket.inet_ntoa, map(IPV4_STRUCT.pack, ips))
+
+def ip_to_int(ip_str):
+    """
+    Convert a dotted-quad IP address to an integer.
+    
+    Args:
+        ip_str (str): IP address, e.g. '192.168.1.5'
+        
+    Returns:
+        int: The IP address as an unsigned 32-bit integer
+    """
+    return IPV4_STRUCT.unpack(socket.inet_aton(ip_str))[0]
+
+def int_at_least(minimum):
+    """
+    Create an argparse type that accepts integers no smaller than minimum.
+    
+    Args:
+        minimum (int): Smallest value accepted
+    
+    Returns:
+        function: Converts an argument string to an int, raising
+                  argparse.ArgumentTypeError if it is invalid or too small
+    """
+    def parse(value):
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid integer value: '{value}'")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {number}")
+        return number
+    
+    return parse
 
 def parse_args():
     """
-    Parse command line arguments and convert subnet(s) to list of IP addresses.
+    Parse command line arguments and convert subnet(s) to ranges of IP addresses.
     
     Returns:
         tuple: A tuple containing:
             - args: The parsed command line arguments
-            - ip_list: List of IP addresses to ping
-            - subnet_map: Dictionary mapping subnets to their IPs
+            - ip_count: Total number of IP addresses to ping
+            - subnet_map: Dictionary mapping subnets to ranges of their IPs
     """
     parser = argparse.ArgumentParser(description="Ping all hosts in a subnet")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("-n", "--network", help="Subnet to ping in CIDR notation (e.g., 192.168.1.0/24)")
     group.add_argument("-i", "--input", help="CSV file containing subnets to ping (one subnet per line)")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="auto",
+                        help="How to ping the hosts (default: auto, the fastest one available)")
+    parser.add_argument("-r", "--rate", type=int_at_least(0), default=2000,
+                        help="Maximum number of pings sent per second, 0 for no limit (default: 2000)")
+    parser.add_argument("-w", "--workers", type=int_at_least(1), default=512,
+                        help="Maximum number of ping commands running at once with the ping backend, at least 1 (default: 512)")
     args = parser.parse_args()
     
-    ip_list = []
-    subnet_map = {}  # Maps subnet to list of IPs in that subnet
+    ip_count = 0
+    subnet_map = {}  # Maps subnet to range of IPs in that subnet
     
     # Process subnet from command line
     if args.network:
         try:
             network = ipaddress.IPv4Network(args.network)
-            subnet_ips = [str(ip) for ip in network.hosts()]
-            ip_list.extend(subnet_ips)
+            subnet_ips = network_hosts(network)
+            ip_count += len(subnet_ips)
             subnet_map[args.network] = subnet_ips
             print(f"Parsed subnet {args.network} into {len(subnet_ips)} IP addresses")
         except ValueError as e:
@@ -145,14 +395,14 @@ def parse_args():
                         subnet = row[0].strip()  # Assume subnet is in the first column
                         try:
                             network = ipaddress.IPv4Network(subnet)
-                            subnet_ips = [str(ip) for ip in network.hosts()]
-                            ip_list.extend(subnet_ips)
+                            subnet_ips = network_hosts(network)
+                            ip_count += len(subnet_ips)
                             subnet_map[subnet] = subnet_ips
                             print(f"Parsed subnet {subnet} into {len(subnet_ips)} IP addresses")
                         except ValueError as e:
                             print(f"Warning: Skipping invalid subnet '{subnet}': {e}")
             
-            if not ip_list:
+            if not ip_count:
                 print("Error: No valid subnets found in the CSV file")
                 exit(1)
         except FileNotFoundError:
@@ -162,209 +412,711 @@ def parse_args():
             print(f"Error reading CSV file: {e}")
             exit(1)
     
-    print(f"Total IP addresses to ping: {len(ip_list)}")
-    return args, ip_list, subnet_map
+    print(f"Total IP addresses to ping: {ip_count}")
+    return args, ip_count, subnet_map
 
-def display_progress(subnet, current, total, subnet_ips, reachable_count=None):
+def progress_milestones(total):
+    """
+    Get the completion counts at which scan progress is displayed.
+    
+    Progress is shown at start, 25%, 50%, 75% and completion. Computing the
+    points once per subnet lets the scan loop compare against the next one
+    instead of searching the list on every completed ping.
+    
+    Args:
+        total (int): Total number of IPs in the subnet
+        
+    Returns:
+        list: Distinct completion counts in increasing order
+    """
+    return sorted({1, int(total * 0.25), int(total * 0.5), int(total * 0.75), total} - {0})
+
+def display_progress(subnet, current, total, subnet_ips, start=0, reachable_count=None):
     """
     Display simple progress information for the current subnet being pinged.
     
-    Shows progress as a percentage and the range of host IDs being processed.
-    At completion, also shows the number of reachable hosts found.
+    Shows progress as a percentage and the range of host IDs processed since
+    the previous progress point. At completion, also shows the number of
+    reachable hosts found.
     
     Args:
         subnet (str): The subnet being pinged
-        current (int): Current IP index
+        current (int): Number of IPs completed, one of progress_milestones()
         total (int): Total number of IPs in the subnet
-        subnet_ips (list): List of IP addresses in the subnet
+        subnet_ips (range): IP addresses in the subnet, as integers
+        start (int): Number of IPs completed at the previous progress point (default: 0)
         reachable_count (int, optional): Number of reachable hosts found so far
     """
-    # Only show progress at start, 25%, 50%, 75% and completion
-    progress_points = [1, int(total * 0.25), int(total * 0.5), int(total * 0.75), total]
+    percent = int(100 * current / total)
+    
+    # Get the first and last IP in the current range, ensuring indices
+    # are within bounds
+    first_idx = min(start, len(subnet_ips) - 1)
+    last_idx = min(current - 1, len(subnet_ips) - 1)
+    
+    first_ip = subnet_ips[first_idx]
+    last_ip = subnet_ips[last_idx]
     
-    if current in progress_points or current == total:
-        percent = int(100 * current / total)
+    # Extract just the host portion (last octet) of the IPs
+    first_host = first_ip & 0xFF
+    last_host = last_ip & 0xFF
+    
+    if reachable_count is not None and current == total:
+        print(
+            f"Scanning subnet {subnet}... 100% complete. "
+            f"Found {reachable_count} reachable hosts."
+        )
+    else:
+        print(
+            f"Scanning subnet {subnet}... {percent}% complete "
+            f"(.{first_host} - .{last_host})"
+        )
+
+def output(subnet, subnet_ips, reach, filename_prefix):
+    """
+    Output the ping results of one subnet to a CSV file.
+    
+    Called as soon as a subnet has been scanned, so only one subnet's results
+    are held at a time. Saves the CSV file in the 'results' directory, which
+    main creates before scanning, with the naming convention:
+    DDMMMYYYY_ping results_network ID.csv
+    
+    Args:
+        subnet (str): The subnet that was pinged
+        subnet_ips (range): IP addresses in the subnet, as integers
+        reach (bytearray): One byte per IP in subnet_ips, 1 if it responded
+                           and 0 otherwise
+        filename_prefix (str): Scan date and label shared by every subnet's
+                               file (e.g., 15JUN2025_ping results_)
+    """
+    try:
+        # Create filename: DDMMMYYYY_ping results_network ID.csv
+        # Replace '/' with '_' in subnet for filename
+        subnet_clean = subnet.replace('/', '_')
+        filename = f"{filename_prefix}{subnet_clean}.csv"
         
-        # Get the first and last IP in the current range
-        # For the first progress point, start from the first IP
-        # For other progress points, start from the previous progress point
-        if current == 1:
-            first_idx = 0
-        else:
-            prev_point_idx = progress_points.index(current) - 1
-            first_idx = progress_points[prev_point_idx]
-            
-        # Ensure indices are within bounds
-        first_idx = min(first_idx, len(subnet_ips) - 1)
-        last_idx = min(current - 1, len(subnet_ips) - 1)
+        print(f"Writing results for subnet {subnet} to {filename}")
         
-        first_ip = subnet_ips[first_idx]
-        last_ip = subnet_ips[last_idx]
+        filepath = os.path.join('results', filename)
         
-        # Extract just the host portion of the IPs
-        first_host = first_ip.split('.')[-1]
-        last_host = last_ip.split('.')[-1]
+        # Build the whole CSV in memory and write it in one go. IPs and
+        # true/false never need quoting, so the rows are formatted directly
+        # rather than through csv.writer, ending in \r\n as csv.writer did
+        labels = ('false', 'true')
+        rows = ["IP Address,Reachable"]
+        rows.extend(
+            f"{ip},{labels[is_reachable]}"
+            for ip, is_reachable in zip(ips_to_str(subnet_ips), reach)
+        )
+        rows.append("")
+        with open(filepath, 'w', newline='') as csvfile:
+            csvfile.write("\r\n".join(rows))
+        
+        print(f"Results saved to {filepath}")
+    except IOError as e:
+        print(f"Error writing results for subnet {subnet}: {e}")
+    except Exception as e:
+        print(f"Unexpected error writing results for subnet {subnet}: {e}")
+
+async def ping_subnet_async(subnet, subnet_ips, ping_function, concurrency=512, rate=2000):
+    """
+    Ping all IPs in a subnet by running the ping command concurrently under asyncio.
+    
+    A semaphore bounds the number of ping processes in flight, so thousands of
+    hosts can be pinged from one event loop without a thread per host. Pings
+    are started at no more than rate per second.
+    
+    Args:
+        subnet (str): The subnet being pinged
+        subnet_ips (range): IP addresses in the subnet, as integers
+        ping_function (function): The ping coroutine to use, from make_pinger()
+        concurrency (int): Maximum number of ping processes in flight (default: 512)
+        rate (int): Maximum number of pings started per second, 0 for no limit (default: 2000)
         
-        if reachable_count is not None and current == total:
-            print(
-                f"Scanning subnet {subnet}... 100% complete. "
-                f"Found {reachable_count} reachable hosts."
+    Returns:
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0 otherwise
+    """
+    reach = bytearray(len(subnet_ips))
+    subnet_reachable = 0
+    completed = 0
+    total = len(subnet_ips)
+    milestones = progress_milestones(total)
+    next_milestone = 0  # Index of the next progress point to display
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    print(f"\nStarting scan of subnet {subnet} ({total} hosts)...")
+    
+    async def ping_one(index, ip):
+        nonlocal subnet_reachable, completed, next_milestone
+        
+        async with semaphore:
+            try:
+                is_reachable = await ping_function(ip_to_str(ip))
+            except Exception as e:
+                print(f"Error processing result for {ip_to_str(ip)}: {e}")
+                is_reachable = False
+        
+        # Update counters
+        completed += 1
+        if is_reachable:
+            reach[index] = 1
+            subnet_reachable += 1
+        
+        # Display progress at key points
+        if completed >= milestones[next_milestone]:
+            display_progress(
+                subnet=subnet,
+                current=completed,
+                total=total,
+                subnet_ips=subnet_ips,
+                start=milestones[next_milestone - 1] if next_milestone else 0,
+                reachable_count=subnet_reachable if completed == total else None
             )
+            next_milestone += 1
+    
+    # Start the pings no faster than the rate allows
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / rate if rate > 0 else 0
+    next_start = loop.time()
+    tasks = []
+    for index, ip in enumerate(subnet_ips):
+        if interval:
+            delay = next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_start += interval
+        tasks.append(asyncio.ensure_future(ping_one(index, ip)))
+    
+    await asyncio.gather(*tasks)
+    
+    return reach
+
+def paced(items, rate):
+    """
+    Yield items no faster than rate per second.
+    
+    Each item has a scheduled time one interval after the previous one, and
+    the generator only sleeps when it gets ahead of that schedule. After a
+    slow iteration the following items go out without sleeping until the
+    schedule catches up, rather than each waiting a fixed delay, so slow
+    iterations don't lower the overall rate.
+    
+    Args:
+        items (iterable): Items to yield, such as the hosts of a sweep
+        rate (int): Maximum number of items per second, 0 for no limit
+    
+    Yields:
+        The items, in order
+    """
+    if rate <= 0:
+        yield from items
+        return
+    
+    interval = 1.0 / rate
+    next_send = time.monotonic()
+    for item in items:
+        delay = next_send - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_send += interval
+        yield item
+
+def receive_replies(sock, handle_reply, deadline, timeout):
+    """
+    Receive packets from a socket until the scan's reply deadline passes.
+    
+    Runs on a receiver thread while the scan is still sending. The deadline
+    is only known once every request has gone out, so it's passed as a
+    one-element list that the sender fills in.
+    
+    Args:
+        sock (socket.socket): Socket to read replies from
+        handle_reply (function): Called with (packet, address) for each packet
+        deadline (list): [None] while sending, then [time.monotonic() deadline]
+        timeout (float): Longest single wait while the deadline isn't set yet
+    """
+    while True:
+        if deadline[0] is None:
+            wait = timeout
         else:
-            print(
-                f"Scanning subnet {subnet}... {percent}% complete "
-                f"(.{first_host} - .{last_host})"
-            )
+            wait = deadline[0] - time.monotonic()
+            if wait <= 0:
+                break
+        
+        readable, _, _ = select.select([sock], [], [], wait)
+        if not readable:
+            continue
+        
+        # Read every reply already queued, so a burst costs one
+        # recvfrom() per reply instead of a select() and a recvfrom()
+        while True:
+            try:
+                packet, address = sock.recvfrom(1024, RECV_DONTWAIT)
+            except OSError:
+                break
+            handle_reply(packet, address)
+            if not RECV_DONTWAIT:
+                break
 
-def output(results, subnet_map):
+def ping_subnet_icmp(subnet, subnet_ips, timeout=1.0, rate=2000):
     """
-    Output the ping results to CSV files, one per subnet.
+    Ping all IPs in a subnet directly over ICMP sockets.
     
-    Creates a 'results' directory if it doesn't exist and saves CSV files with
-    the naming convention: DDMMMYYYY_ping results_network ID.csv
+    Every echo request is sent up front, using the IP's index in subnet_ips
+    as the sequence number, while a receiver thread demultiplexes the
+    replies until timeout seconds after the last request went out. Requests
+    are sent at no more than rate per second. Large subnets are spread over
+    up to one datagram socket per CPU, each with its own receiver thread.
     
     Args:
-        results (dict): Dictionary with IP addresses as keys and boolean values
-                       indicating if they responded
-        subnet_map (dict): Dictionary mapping subnet to list of IPs in that subnet
+        subnet (str): The subnet being pinged
+        subnet_ips (range): IP addresses in the subnet, as integers
+        timeout (float): Seconds to wait for replies after the last send (default: 1.0)
+        rate (int): Maximum number of requests sent per second, 0 for no limit (default: 2000)
+    
+    Returns:
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0 otherwise
+    
+    Raises:
+        OSError: If the ICMP socket could not be opened
     """
-    # Get current date in DDMMMYYYY format (e.g., 15JUN2025)
-    current_date = datetime.now().strftime("%d%b%Y").upper()
+    reach = bytearray(len(subnet_ips))
+    total = len(subnet_ips)
+    ident = os.getpid() & 0xFFFF
+    deadline = [None]  # Set once every request has been sent
     
-    # Process each subnet
-    for subnet, ips in subnet_map.items():
-        try:
-            # Create filename: DDMMMYYYY_ping results_network ID.csv
-            # Replace '/' with '_' in subnet for filename
-            subnet_clean = subnet.replace('/', '_')
-            filename = f"{current_date}_ping results_{subnet_clean}.csv"
-            
-            print(f"Writing results for subnet {subnet} to {filename}")
-            
-            # Create directory if it doesn't exist
-            os.makedirs('results', exist_ok=True)
-            filepath = os.path.join('results', filename)
+    print(f"\nStarting scan of subnet {subnet} ({total} hosts)...")
+    
+    socks = [open_icmp_socket()]
+    try:
+        # Raw sockets deliver the IP header and every ICMP packet on the host;
+        # datagram sockets strip the header and only see replies to our ident
+        raw = socks[0].type == socket.SOCK_RAW
+        
+        # The kernel routes replies to a datagram socket by its own ident, so
+        # large subnets are spread over several sockets, each with its own
+        # receiver. Every raw socket would see every reply, so keep just one
+        if not raw:
+            shards = min(os.cpu_count() or 1, -(-total // ICMP_HOSTS_PER_SOCKET))
+            while len(socks) < shards:
+                socks.append(open_icmp_socket())
+        
+        for sock in socks:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, ICMP_RECV_BUFFER)
+            except OSError:
+                pass
+        
+        def handle_reply(packet, address):
+            if raw:
+                packet = packet[(packet[0] & 0x0F) * 4:]
+            if len(packet) < 8:
+                return
             
-            # Write results to CSV
-            with open(filepath, 'w', newline='') as csvfile:
-                csv_writer = csv.writer(csvfile)
-                # Write header
-                csv_writer.writerow(['IP Address', 'Reachable'])
-                
-                # Write data for IPs in this subnet
-                for ip in ips:
-                    csv_writer.writerow([ip, str(results.get(ip, False)).lower()])
+            icmp_type, _, _, reply_ident, seq = ICMP_HEADER.unpack_from(packet)
+            if icmp_type != ICMP_ECHO_REPLY or (raw and reply_ident != ident):
+                return
             
-            print(f"Results saved to {filepath}")
-        except IOError as e:
-            print(f"Error writing results for subnet {subnet}: {e}")
-        except Exception as e:
-            print(f"Unexpected error writing results for subnet {subnet}: {e}")
+            # Only accept the reply if it came from the IP we sent that seq
+            # to; hosts are consecutive, so the index is the offset from
+            # the first one. Each index is only ever set by one receiver
+            index = ip_to_int(address[0]) - subnet_ips[0]
+            if 0 <= index < total and seq == index & 0xFFFF:
+                reach[index] = 1
+        
+        receivers = [
+            threading.Thread(
+                target=receive_replies,
+                args=(sock, handle_reply, deadline, timeout),
+                daemon=True
+            )
+            for sock in socks
+        ]
+        for receiver in receivers:
+            receiver.start()
+        
+        build_request = echo_request_builder(ident)
+        for index, target in paced(enumerate(ips_to_str(subnet_ips)), rate):
+            try:
+                sock = socks[index % len(socks)]
+                sock.sendto(build_request(index & 0xFFFF), (target, 0))
+            except OSError:
+                # Unroutable or rejected targets simply stay unreachable
+                pass
+        
+        deadline[0] = time.monotonic() + timeout
+        for receiver in receivers:
+            receiver.join()
+    finally:
+        for sock in socks:
+            sock.close()
+    
+    display_progress(
+        subnet=subnet,
+        current=total,
+        total=total,
+        subnet_ips=subnet_ips,
+        reachable_count=reach.count(1)
+    )
+    
+    return reach
 
-def ping_subnet_with_threadpool(subnet, subnet_ips, ping_function):
+def ping_subnet_arp(subnet, subnet_ips, interface, timeout=1.0, rate=2000):
     """
-    Ping all IPs in a subnet using a thread pool for concurrent execution.
+    Find the live hosts of a directly attached subnet with an ARP sweep.
     
-    Uses ThreadPoolExecutor with default thread count (min(32, os.cpu_count() + 4))
-    for optimal performance based on the system's capabilities.
+    Broadcasts an ARP request for every IP from one raw Ethernet socket while
+    a receiver thread records which IPs send ARP replies. Hosts can't filter
+    ARP the way they filter ICMP, so this also finds hosts that ignore pings.
     
     Args:
         subnet (str): The subnet being pinged
-        subnet_ips (list): List of IP addresses in the subnet
-        ping_function (function): The ping function to use (windows or linux)
+        subnet_ips (range): IP addresses in the subnet, as integers
+        interface (tuple): (name, IP, MAC) of the interface, from find_arp_interface()
+        timeout (float): Seconds to wait for replies after the last request (default: 1.0)
+        rate (int): Maximum number of requests sent per second, 0 for no limit (default: 2000)
         
     Returns:
-        dict: Dictionary with IP addresses as keys and boolean values indicating if they responded
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0 otherwise
+        
+    Raises:
+        OSError: If the raw socket could not be opened (requires root)
     """
-    results = {}
-    subnet_reachable = 0
-    completed = 0
+    name, local_ip, local_mac = interface
+    reach = bytearray(len(subnet_ips))
     total = len(subnet_ips)
+    deadline = [None]  # Set once every request has been sent
+    
+    # We never get an ARP reply from ourselves, but we're clearly up
+    if 0 <= local_ip - subnet_ips[0] < total:
+        reach[local_ip - subnet_ips[0]] = 1
+    
+    # Every request is the same broadcast frame up to the target IP; the
+    # trailing zeros pad it to the 60-byte Ethernet minimum
+    frame_prefix = struct.pack(
+        "!6s6sHHHBBH6s4s6s",
+        b"\xff" * 6, local_mac, ETH_P_ARP,
+        ARPHRD_ETHER, ETH_P_IP, 6, 4, ARP_REQUEST,
+        local_mac, IPV4_STRUCT.pack(local_ip), b"\x00" * 6
+    )
+    padding = b"\x00" * 18
+    
+    print(f"\nStarting scan of subnet {subnet} ({total} hosts) with ARP on {name}...")
+    
+    def handle_reply(frame, address):
+        # Ethernet header (14 bytes), then the ARP operation at offset 20
+        # and the sender's IP at offset 28
+        if len(frame) < 42 or struct.unpack("!H", frame[20:22])[0] != ARP_REPLY:
+            return
+        index = IPV4_STRUCT.unpack(frame[28:32])[0] - subnet_ips[0]
+        if 0 <= index < total:
+            reach[index] = 1
+    
+    with open_arp_socket(name) as sock:
+        receiver = threading.Thread(
+            target=receive_replies,
+            args=(sock, handle_reply, deadline, timeout),
+            daemon=True
+        )
+        receiver.start()
+        
+        for ip in paced(subnet_ips, rate):
+            try:
+                sock.send(frame_prefix + IPV4_STRUCT.pack(ip) + padding)
+            except OSError:
+                pass
+        
+        deadline[0] = time.monotonic() + timeout
+        receiver.join()
+    
+    display_progress(
+        subnet=subnet,
+        current=total,
+        total=total,
+        subnet_ips=subnet_ips,
+        reachable_count=reach.count(1)
+    )
+    
+    return reach
+
+def mark_reachable(subnet_ips, reachable_ips):
+    """
+    Build the per-IP reachability bytes from a list of responding IPs.
+    
+    The IPs come straight from a tool's raw output, so only the ones that
+    responded are ever decoded.
+    
+    Args:
+        subnet_ips (range): IP addresses in the subnet, as integers
+        reachable_ips (list): Dotted-quad IPs that responded, as bytes
+        
+    Returns:
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0 otherwise
+    """
+    reach = bytearray(len(subnet_ips))
+    for ip_bytes in reachable_ips:
+        # Hosts are consecutive, so the index is the offset from the first one
+        index = ip_to_int(ip_bytes.decode("ascii")) - subnet_ips[0]
+        if 0 <= index < len(reach):
+            reach[index] = 1
+    return reach
+
+def ping_subnet_fping(subnet, subnet_ips, timeout=100, rate=2000):
+    """
+    Ping all IPs in a subnet with a single fping process.
+    
+    fping reads the targets from stdin, pings them all concurrently and
+    prints the ones that answered, so the whole subnet costs one process.
+    fping's own error messages are left on stderr, so if it can't run
+    (e.g., it can't open its socket without root) the user sees why.
+    
+    Args:
+        subnet (str): The subnet being pinged
+        subnet_ips (range): IP addresses in the subnet, as integers
+        timeout (int): Initial per-target timeout in milliseconds (default: 100)
+        rate (int): Maximum number of pings sent per second, 0 for no limit (default: 2000)
+        
+    Returns:
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0
+                   otherwise, or None if fping failed
+    """
+    total = len(subnet_ips)
+    
+    # fping spaces its packets in whole milliseconds, 1ms being the fastest
+    interval = max(1, round(1000 / rate)) if rate > 0 else 1
+    cmd = ["fping", "-q", "-a", "-t", str(timeout), "-i", str(interval)]
     
     print(f"\nStarting scan of subnet {subnet} ({total} hosts)...")
     
-    # Use ThreadPoolExecutor with default thread count for optimal performance
-    with ThreadPoolExecutor() as executor:
-        # Submit all ping tasks to the thread pool and store futures
-        futures = []
-        for ip in subnet_ips:
-            future = executor.submit(ping_function, ip)
-            futures.append((future, ip))
+    # -q -a prints only the reachable targets, one per line
+    result = subprocess.run(
+        cmd,
+        input="\n".join(ips_to_str(subnet_ips)).encode("ascii"),
+        stdout=subprocess.PIPE,
+        check=False  # fping exits with 1 when any target is unreachable
+    )
+    
+    # 2 means no target could be resolved, 3 and above mean fping itself
+    # failed (bad arguments, no socket), so none of the targets were pinged
+    if result.returncode >= 3:
+        print(f"Error: fping failed with exit code {result.returncode}, skipping subnet {subnet}")
+        return None
+    
+    reach = mark_reachable(subnet_ips, result.stdout.split())
+    
+    display_progress(
+        subnet=subnet,
+        current=total,
+        total=total,
+        subnet_ips=subnet_ips,
+        reachable_count=reach.count(1)
+    )
+    
+    return reach
+
+def ping_subnet_nmap(subnet, subnet_ips, rate=2000):
+    """
+    Ping all IPs in a subnet with a single nmap host discovery scan.
+    
+    Runs 'nmap -sn' over the whole subnet and parses its greppable output.
+    When run as root on a local segment nmap discovers hosts with ARP, which
+    also finds hosts that filter ICMP.
+    
+    Args:
+        subnet (str): The subnet being pinged
+        subnet_ips (range): IP addresses in the subnet, as integers
+        rate (int): Maximum number of probes sent per second, 0 for no limit (default: 2000)
+        
+    Returns:
+        bytearray: One byte per IP in subnet_ips, 1 if it responded and 0
+                   otherwise, or None if nmap failed
+    """
+    total = len(subnet_ips)
+    cmd = ["nmap", "-sn", "-n", "-T4", "--max-retries", "1", "-oG", "-"]
+    if rate > 0:
+        cmd += ["--max-rate", str(rate)]
+    # nmap only understands /bits, not the netmask or hostmask forms
+    # (e.g., 10.9.0.0/255.255.255.248) that were accepted when parsing
+    cmd.append(ipaddress.IPv4Network(subnet).with_prefixlen)
+    
+    print(f"\nStarting scan of subnet {subnet} ({total} hosts)...")
+    
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        check=False  # Checked below so a failed scan isn't reported as all down
+    )
+    
+    # nmap exits with 0 whether or not hosts are up, so anything else means
+    # the scan didn't run; its reason has already been printed on stderr
+    if result.returncode != 0:
+        print(f"Error: nmap failed with exit code {result.returncode}, skipping subnet {subnet}")
+        return None
+    
+    # Greppable output has one line per host that is up:
+    # Host: 192.168.1.5 ()	Status: Up
+    reachable = []
+    for line in result.stdout.splitlines():
+        if line.startswith(b"Host:") and b"Status: Up" in line:
+            reachable.append(line.split()[1])
+    reach = mark_reachable(subnet_ips, reachable)
+    
+    display_progress(
+        subnet=subnet,
+        current=total,
+        total=total,
+        subnet_ips=subnet_ips,
+        reachable_count=reach.count(1)
+    )
+    
+    return reach
+
+def select_backend(requested):
+    """
+    Pick the backend used to ping the hosts.
+    
+    With 'auto', prefers a single ICMP socket, then fping, then nmap, and
+    finally the OS ping command. A specific backend is only checked for
+    availability. ARP sweeps only reach directly attached subnets, so even
+    with 'arp' main() decides per subnet whether ARP is used.
+    
+    Args:
+        requested (str): Backend name from the command line, or 'auto'
         
-        # Process results as they complete
-        for future, ip in futures:
+    Returns:
+        str: The backend to use, or None if the requested one is unavailable
+    """
+    if requested == 'auto':
+        candidates = [backend for backend in BACKENDS if backend not in ('auto', 'arp')]
+    else:
+        candidates = [requested]
+    
+    for backend in candidates:
+        if backend == 'arp':
             try:
-                is_reachable = future.result()
-                results[ip] = is_reachable
-                
-                # Update counters
-                completed += 1
-                if is_reachable:
-                    subnet_reachable += 1
-                
-                # Display progress at key points
-                display_progress(
-                    subnet=subnet,
-                    current=completed,
-                    total=total,
-                    subnet_ips=subnet_ips,
-                    reachable_count=subnet_reachable if completed == total else None
-                )
-            except Exception as e:
-                print(f"Error processing result for {ip}: {e}")
-                results[ip] = False
-                completed += 1
+                open_arp_socket().close()
+                return backend
+            except OSError as e:
+                print(f"ARP socket unavailable: {e}")
+        elif backend == 'icmp':
+            try:
+                open_icmp_socket().close()
+                return backend
+            except OSError as e:
+                print(f"ICMP socket unavailable: {e}")
+        elif backend in ('fping', 'nmap'):
+            if shutil.which(backend):
+                return backend
+            print(f"{backend} not found on the PATH")
+        else:
+            return backend
     
-    return results
+    return None
 
 def main():
     """
     Main function that orchestrates the subnet scanning process.
     
-    Parses command line arguments, detects OS, selects appropriate ping function,
-    scans subnets using thread pooling, and outputs results to CSV files.
+    Parses command line arguments, detects OS, selects the scanning backend,
+    scans each subnet with it, and outputs results to CSV files.
     """
     try:
         # Parse command line arguments and get list of IPs
-        args, ip_list, subnet_map = parse_args()
+        args, ip_count, subnet_map = parse_args()
         
         # Detect OS
         os_type = check_os()
         print(f"Detected OS: {os_type}")
         
         # Select the appropriate ping function based on OS
-        if os_type == 'windows':
-            ping_function = ping_ip_windows
-        elif os_type == 'linux':
-            ping_function = ping_ip_linux
+        if os_type in ('windows', 'linux'):
+            ping_function = make_pinger(os_type)
         else:
             print(f"Unsupported OS: {os_type}")
             return
         
-        # Create results dictionary
-        results = {}
+        # Select how to ping the hosts
+        backend = select_backend(args.backend)
+        if backend is None:
+            print(f"Backend '{args.backend}' is not available")
+            return
+        print(f"Using backend: {backend}")
+        
+        # With 'auto', directly attached subnets are swept with ARP when we
+        # have the privileges for it
+        use_arp = backend == 'arp'
+        if args.backend == 'auto':
+            try:
+                open_arp_socket().close()
+                use_arp = True
+                print("Using ARP for directly attached subnets")
+            except OSError:
+                pass
         
-        # Process each subnet separately with thread pooling
+        # Get current date in DDMMMYYYY format (e.g., 15JUN2025)
+        current_date = datetime.now().strftime("%d%b%Y").upper()
+        filename_prefix = f"{current_date}_ping results_"
+        reachable = 0
+        
+        # Create the results directory once rather than for every subnet
+        os.makedirs('results', exist_ok=True)
+        
+        # Process each subnet separately, writing its results once scanned
         for subnet, subnet_ips in subnet_map.items():
-            # Ping the subnet using thread pool
-            subnet_results = ping_subnet_with_threadpool(
-                subnet=subnet,
-                subnet_ips=subnet_ips,
-                ping_function=ping_function
-            )
+            interface = find_arp_interface(subnet_ips) if use_arp else None
+            if interface:
+                reach = ping_subnet_arp(
+                    subnet=subnet,
+                    subnet_ips=subnet_ips,
+                    interface=interface,
+                    rate=args.rate
+                )
+            elif backend == 'arp':
+                print(f"\nSkipping subnet {subnet}: not on a directly attached Ethernet network")
+                ip_count -= len(subnet_ips)
+                continue
+            elif backend == 'icmp':
+                reach = ping_subnet_icmp(
+                    subnet=subnet,
+                    subnet_ips=subnet_ips,
+                    rate=args.rate
+                )
+            elif backend == 'fping':
+                reach = ping_subnet_fping(
+                    subnet=subnet,
+                    subnet_ips=subnet_ips,
+                    rate=args.rate
+                )
+            elif backend == 'nmap':
+                reach = ping_subnet_nmap(
+                    subnet=subnet,
+                    subnet_ips=subnet_ips,
+                    rate=args.rate
+                )
+            else:
+                reach = asyncio.run(ping_subnet_async(
+                    subnet=subnet,
+                    subnet_ips=subnet_ips,
+                    ping_function=ping_function,
+                    concurrency=args.workers,
+                    rate=args.rate
+                ))
+            
+            # The backend couldn't scan this subnet and has said why
+            if reach is None:
+                ip_count -= len(subnet_ips)
+                continue
             
-            # Add subnet results to overall results
-            results.update(subnet_results)
+            reachable += reach.count(1)
+            
+            # Output results to CSV file
+            output(subnet, subnet_ips, reach, filename_prefix)
         
         # Summarize results in CLI
-        reachable = sum(1 for is_reachable in results.values() if is_reachable)
         print(
-            f"\nScan complete: {reachable} out of {len(ip_list)} hosts are reachable"
+            f"\nScan complete: {reachable} out of {ip_count} hosts are reachable"
         )
         
-        # Output results to CSV files
-        output(results, subnet_map)
-        
     except KeyboardInterrupt:
         print("\nScan interrupted by user. Exiting...")
     except Exception as e: